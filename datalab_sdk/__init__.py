@@ -5,38 +5,43 @@ This SDK provides both synchronous and asynchronous interfaces to the Datalab AP
 supporting document conversion, extraction, segmentation, and more.
 """
 
-from .client import DatalabClient, AsyncDatalabClient
-from .exceptions import DatalabError, DatalabAPIError, DatalabTimeoutError
-from .models import (
-    ConversionResult,
-    CreateDocumentResult,
-    FileResult,
-    OCRResult,
-    ConvertOptions,
-    ExtractOptions,
-    SegmentOptions,
-    CustomProcessorOptions,
-    CustomPipelineOptions,
-    TrackChangesOptions,
-    OCROptions,
-    FormFillingOptions,
-    FormFillingResult,
-    Workflow,
-    WorkflowStep,
-    WorkflowExecution,
-    InputConfig,
-    UploadedFileMetadata,
-    ExtractionSchema,
-    PipelineProcessor,
-    PipelineConfig,
-    PipelineVersion,
-    PipelineExecution,
-    PipelineExecutionStepResult,
-    CustomProcessor,
-    CustomProcessorVersion,
-)
+import importlib
+from typing import TYPE_CHECKING
+
 from .settings import settings
 
+if TYPE_CHECKING:
+    from .client import DatalabClient, AsyncDatalabClient
+    from .exceptions import DatalabError, DatalabAPIError, DatalabTimeoutError
+    from .models import (
+        ConversionResult,
+        CreateDocumentResult,
+        FileResult,
+        OCRResult,
+        ConvertOptions,
+        ExtractOptions,
+        SegmentOptions,
+        CustomProcessorOptions,
+        CustomPipelineOptions,
+        TrackChangesOptions,
+        OCROptions,
+        FormFillingOptions,
+        FormFillingResult,
+        Workflow,
+        WorkflowStep,
+        WorkflowExecution,
+        InputConfig,
+        UploadedFileMetadata,
+        ExtractionSchema,
+        PipelineProcessor,
+        PipelineConfig,
+        PipelineVersion,
+        PipelineExecution,
+        PipelineExecutionStepResult,
+        CustomProcessor,
+        CustomProcessorVersion,
+    )
+
 __version__ = settings.VERSION
 __all__ = [
     "DatalabClient",
@@ -71,3 +76,30 @@ __all__ = [
     "CustomProcessor",
     "CustomProcessorVersion",
 ]
+
+# Submodules are imported on first attribute access (PEP 562), so importing
+# the package (e.g. for the CLI) doesn't pull in aiohttp until it's needed
+_LAZY_MODULES = {
+    "DatalabClient": ".client",
+    "AsyncDatalabClient": ".client",
+    "DatalabError": ".exceptions",
+    "DatalabAPIError": ".exceptions",
+    "DatalabTimeoutError": ".exceptions",
+}
+# ``settings`` is not listed: the package attribute is the Settings instance
+_SUBMODULES = frozenset({"cli", "client", "exceptions", "mimetypes", "models"})
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_MODULES.get(name, ".models"), __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -6,12 +6,14 @@ Datalab SDK Command Line Interface
 import os
 import sys
 import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, FrozenSet, Collection
 import click
 from tqdm import tqdm
 
-from datalab_sdk.client import AsyncDatalabClient, DatalabClient
 from datalab_sdk.mimetypes import SUPPORTED_EXTENSIONS
 from datalab_sdk.models import (
     OCROptions,
@@ -24,10 +26,13 @@ from datalab_sdk.models import (
     WorkflowStep,
     InputConfig,
 )
-from datalab_sdk.exceptions import DatalabError
+from datalab_sdk.exceptions import DatalabError, DatalabAPIError
 from datalab_sdk.settings import settings
 import json
 
+# Lowercased once so directory scans can use O(1) membership checks
+_SUPPORTED_EXTENSION_SET = frozenset(ext.lower() for ext in SUPPORTED_EXTENSIONS)
+
 
 # Common CLI options
 def common_options(func):
@@ -60,6 +65,18 @@ def common_options(func):
     func = click.option(
         "--poll_interval", default=1, type=int, help="Polling interval in seconds"
     )(func)
+    func = click.option(
+        "--max_retries",
+        default=3,
+        type=int,
+        help="Retries per file for gateway errors (502/503/504); each retry resubmits the file",
+    )(func)
+    func = click.option(
+        "--rps",
+        default=10.0,
+        type=float,
+        help="Maximum number of files submitted per second (status polls and client retries are not limited)",
+    )(func)
     return func
 
 
@@ -95,17 +112,77 @@ def marker_options(func):
     return func
 
 
+@dataclass(slots=True)
+class ProcessedFile:
+    """Outcome of processing a single file in a batch"""
+
+    file_path: str
+    output_path: Optional[str]
+    success: bool
+    error: Optional[str] = None
+    page_count: Optional[int] = None
+
+
+class AsyncRateLimiter:
+    """Enforces a minimum interval between successive acquisitions"""
+
+    def __init__(self, rps: Optional[float] = None):
+        self.min_interval = 1.0 / rps if rps else 0.0
+        self.last_sent = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.min_interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self.min_interval - (loop.time() - self.last_sent)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.last_sent = loop.time()
+
+
+# 429s are not listed: the client already retries them (honouring
+# Retry-After) on both submit and poll, and restarting the whole file on
+# top of that would multiply the attempts and create duplicate jobs
+TRANSIENT_STATUS_CODES = (502, 503, 504)
+
+
+def is_transient_error(e: BaseException) -> bool:
+    """Whether a failed file is worth retrying (gateway errors)"""
+    return (
+        isinstance(e, DatalabAPIError)
+        and getattr(e, "status_code", None) in TRANSIENT_STATUS_CODES
+    )
+
+
 def find_files_in_directory(
-    directory: Path, extensions: Optional[List[str]] = None
+    directory: Path, extensions: Optional[Collection[str]] = None
 ) -> List[Path]:
     """Find all supported files in a directory"""
     if extensions is None:
-        extensions = SUPPORTED_EXTENSIONS
+        extensions = _SUPPORTED_EXTENSION_SET
+    elif not isinstance(extensions, frozenset):
+        extensions = frozenset(ext.lower() for ext in extensions)
 
+    # Iterative scandir walk: DirEntry type checks reuse the cached d_type,
+    # and Path objects are only built for matching files
     files = []
-    for file_path in directory.rglob("*"):
-        if file_path.is_file() and file_path.suffix.lower() in extensions:
-            files.append(file_path)
+    stack = [str(directory)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (
+                        os.path.splitext(entry.name)[1].lower() in extensions
+                        and entry.is_file()
+                    ):
+                        files.append(Path(entry.path))
+        except OSError:
+            # Skip unreadable directories, as Path.rglob did
+            continue
 
     return files
 
@@ -120,81 +197,138 @@ async def process_files_async(
     base_url: str | None = None,
     max_polls: int = 300,
     poll_interval: int = 1,
-) -> List[dict]:
+    rps: Optional[float] = None,
+    max_fs_concurrent: int = 32,
+    max_retries: int = 3,
+) -> List[ProcessedFile]:
     """Process files asynchronously"""
+    from datalab_sdk.client import AsyncDatalabClient
+    from tenacity import (
+        AsyncRetrying,
+        retry_if_exception,
+        stop_after_attempt,
+        wait_exponential_jitter,
+    )
+
     semaphore = asyncio.Semaphore(max_concurrent)
+    fs_semaphore = asyncio.BoundedSemaphore(max_fs_concurrent)
+    limiter = AsyncRateLimiter(rps)
+
+    # Options are shared by every file, so inspect them once up front.
+    # For extract/segment with checkpoint_id, don't pass file_path
+    has_checkpoint = getattr(options, "checkpoint_id", None) is not None
 
-    async def call_api(client, file_path, output_path):
-        """Make API call - client handles retries for rate limits"""
+    async def call_api(client, file_path):
+        """Make API call - retried by process_single_file on transient errors"""
+        await limiter.acquire()
         api_method = getattr(client, method)
-        # For extract/segment with checkpoint_id, don't pass file_path
-        has_checkpoint = (
-            options is not None
-            and hasattr(options, "checkpoint_id")
-            and options.checkpoint_id is not None
-        )
         if has_checkpoint:
             return await api_method(
                 options=options,
-                save_output=output_path,
                 max_polls=max_polls,
                 poll_interval=poll_interval,
             )
         return await api_method(
             file_path,
             options=options,
-            save_output=output_path,
             max_polls=max_polls,
             poll_interval=poll_interval,
         )
 
-    async def process_single_file(file_path: Path) -> dict:
-        async with semaphore:
-            try:
-                # Create output path
-                relative_path = file_path.name
-                output_path = (
-                    output_dir / Path(relative_path).stem / Path(relative_path).stem
-                )
+    def save_result(result, output_path: Path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        result.save_output(output_path)
+
+    async def process_single_file(client, file_path: Path) -> ProcessedFile:
+        try:
+            # Create output path
+            stem = file_path.stem
+            output_path = output_dir / stem / stem
+
+            async with semaphore:
+                result = await AsyncRetrying(
+                    retry=retry_if_exception(is_transient_error),
+                    stop=stop_after_attempt(max_retries + 1),
+                    wait=wait_exponential_jitter(initial=1, max=30),
+                    reraise=True,
+                )(call_api, client, file_path)
+
+            # Writes run off the event loop under their own limit, so slow
+            # disks don't hold up network slots (and vice versa)
+            if result.success:
+                async with fs_semaphore:
+                    await asyncio.to_thread(save_result, result, output_path)
+
+            return ProcessedFile(
+                file_path=str(file_path),
+                output_path=str(output_path),
+                success=result.success,
+                error=result.error,
+                page_count=result.page_count,
+            )
+        except Exception as e:
+            return ProcessedFile(
+                file_path=str(file_path),
+                output_path=None,
+                success=False,
+                error=str(e),
+            )
 
-                async with AsyncDatalabClient(
-                    api_key=api_key, base_url=base_url
-                ) as client:
-                    result = await call_api(client, file_path, output_path)
-
-                return {
-                    "file_path": str(file_path),
-                    "output_path": str(output_path),
-                    "success": result.success,
-                    "error": result.error,
-                    "page_count": result.page_count,
-                }
-            except Exception as e:
-                return {
-                    "file_path": str(file_path),
-                    "output_path": None,
-                    "success": False,
-                    "error": str(e),
-                    "page_count": None,
-                }
-
-    # Process all files concurrently with progress bar
-    tasks = [asyncio.create_task(process_single_file(file_path)) for file_path in files]
     results = []
 
-    with tqdm(total=len(tasks), desc="Processing", unit="file") as pbar:
-        for coro in asyncio.as_completed(tasks):
-            result = await coro
-            results.append(result)
-            # Update progress bar description with current file
-            filename = Path(result["file_path"]).name
-            status = "✓" if result["success"] else "✗"
-            pbar.set_postfix_str(f"{status} {filename[:30]}")
-            pbar.update(1)
+    # Share one client (and its connection pool) across all files, sized so
+    # every in-flight file gets a connection instead of queueing for one
+    # against the request timeout
+    async with AsyncDatalabClient(
+        api_key=api_key,
+        base_url=base_url,
+        max_connections=max(100, max_concurrent),
+    ) as client:
+        # Only keep a bounded window of tasks alive (enough to fill both the
+        # network and filesystem limits), rather than one per file up front
+        max_in_flight = max_concurrent + max_fs_concurrent
+        pending_files = iter(files)
+        in_flight = set()
+
+        with tqdm(total=len(files), desc="Processing", unit="file") as pbar:
+            while True:
+                for file_path in islice(pending_files, max_in_flight - len(in_flight)):
+                    in_flight.add(
+                        asyncio.create_task(process_single_file(client, file_path))
+                    )
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    results.append(result)
+                    # Update progress bar description with current file
+                    filename = Path(result.file_path).name
+                    status = "✓" if result.success else "✗"
+                    if not result.success:
+                        # Surface failures as they happen rather than only in the summary
+                        pbar.write(f"{status} {result.file_path}: {result.error}")
+                    pbar.set_postfix_str(f"{status} {filename[:30]}")
+                    pbar.update(1)
 
     return results
 
 
+def resolve_api_key(api_key: Optional[str]) -> str:
+    """Return the explicit API key or fall back to DATALAB_API_KEY"""
+    if api_key is None:
+        api_key = settings.DATALAB_API_KEY
+
+    if api_key is None:
+        raise DatalabError(
+            "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
+        )
+    return api_key
+
+
 def setup_output_directory(output_dir: Optional[str]) -> Path:
     """Setup and return output directory"""
     if output_dir is None:
@@ -205,17 +339,19 @@ def setup_output_directory(output_dir: Optional[str]) -> Path:
     return output_dir
 
 
-def parse_extensions(extensions: Optional[str]) -> Optional[List[str]]:
+def parse_extensions(extensions: Optional[str]) -> Optional[FrozenSet[str]]:
     """Parse file extensions from comma-separated string"""
     if not extensions:
         return None
 
-    file_extensions = [ext.strip() for ext in extensions.split(",")]
-    return [ext if ext.startswith(".") else f".{ext}" for ext in file_extensions]
+    file_extensions = (ext.strip().lower() for ext in extensions.split(","))
+    return frozenset(
+        ext if ext.startswith(".") else f".{ext}" for ext in file_extensions
+    )
 
 
 def get_files_to_process(
-    path: Path, file_extensions: Optional[List[str]]
+    path: Path, file_extensions: Optional[FrozenSet[str]]
 ) -> List[Path]:
     """Get list of files to process"""
     if path.is_file():
@@ -229,21 +365,20 @@ def get_files_to_process(
         return find_files_in_directory(path, file_extensions)
 
 
-def show_results(results: List[dict], operation: str, output_dir: Path):
+def show_results(results: List[ProcessedFile], operation: str, output_dir: Path):
     """Display processing results"""
-    successful = sum(1 for r in results if r["success"])
-    failed = len(results) - successful
+    failures = [r for r in results if not r.success]
+    successful = len(results) - len(failures)
 
     click.echo(f"\n{operation} Summary:")
     click.echo(f"   Successfully processed: {successful} files")
-    if failed > 0:
-        click.echo(f"   Failed: {failed} files")
+    if failures:
+        click.echo(f"   Failed: {len(failures)} files")
 
         # Show failed files
         click.echo("\n   Failed files:")
-        for result in results:
-            if not result["success"]:
-                click.echo(f"      - {result['file_path']}: {result['error']}")
+        for result in failures:
+            click.echo(f"      - {result.file_path}: {result.error}")
 
     click.echo(f"\nOutput saved to: {output_dir}")
 
@@ -261,6 +396,8 @@ def process_documents(
     skip_cache: bool,
     max_polls: int,
     poll_interval: int,
+    rps: Optional[float] = None,
+    max_retries: int = 3,
     # Convert-specific options
     output_format: Optional[str] = None,
     paginate: bool = False,
@@ -282,13 +419,7 @@ def process_documents(
     """Unified document processing function"""
     try:
         # Validate inputs
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
-
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        api_key = resolve_api_key(api_key)
 
         if base_url is None:
             base_url = settings.DATALAB_HOST
@@ -376,6 +507,8 @@ def process_documents(
                 base_url=base_url,
                 max_polls=max_polls,
                 poll_interval=poll_interval,
+                rps=rps,
+                max_retries=max_retries,
             )
         )
 
@@ -418,6 +551,8 @@ def convert(
     skip_cache: bool,
     max_polls: int,
     poll_interval: int,
+    rps: float,
+    max_retries: int,
     output_format: str,
     paginate: bool,
     disable_image_extraction: bool,
@@ -439,6 +574,8 @@ def convert(
         skip_cache=skip_cache,
         max_polls=max_polls,
         poll_interval=poll_interval,
+        rps=rps,
+        max_retries=max_retries,
         output_format=output_format,
         paginate=paginate,
         disable_image_extraction=disable_image_extraction,
@@ -471,6 +608,8 @@ def extract(
     skip_cache: bool,
     max_polls: int,
     poll_interval: int,
+    rps: float,
+    max_retries: int,
 ):
     """Extract structured data from documents using a JSON schema"""
     process_documents(
@@ -486,6 +625,8 @@ def extract(
         skip_cache=skip_cache,
         max_polls=max_polls,
         poll_interval=poll_interval,
+        rps=rps,
+        max_retries=max_retries,
         output_format=output_format,
         mode=mode,
         page_schema=page_schema,
@@ -514,6 +655,8 @@ def segment(
     skip_cache: bool,
     max_polls: int,
     poll_interval: int,
+    rps: float,
+    max_retries: int,
 ):
     """Segment documents into sections using a schema"""
     process_documents(
@@ -529,6 +672,8 @@ def segment(
         skip_cache=skip_cache,
         max_polls=max_polls,
         poll_interval=poll_interval,
+        rps=rps,
+        max_retries=max_retries,
         mode=mode,
         segmentation_schema=segmentation_schema,
         checkpoint_id=checkpoint_id,
@@ -558,6 +703,8 @@ def custom_pipeline(
     skip_cache: bool,
     max_polls: int,
     poll_interval: int,
+    rps: float,
+    max_retries: int,
 ):
     """Run a custom pipeline on documents"""
     process_documents(
@@ -573,6 +720,8 @@ def custom_pipeline(
         skip_cache=skip_cache,
         max_polls=max_polls,
         poll_interval=poll_interval,
+        rps=rps,
+        max_retries=max_retries,
         output_format=output_format,
         mode=mode,
         pipeline_id=pipeline_id,
@@ -599,6 +748,8 @@ def track_changes(
     skip_cache: bool,
     max_polls: int,
     poll_interval: int,
+    rps: float,
+    max_retries: int,
 ):
     """Extract tracked changes from DOCX documents"""
     process_documents(
@@ -614,6 +765,8 @@ def track_changes(
         skip_cache=skip_cache,
         max_polls=max_polls,
         poll_interval=poll_interval,
+        rps=rps,
+        max_retries=max_retries,
         output_format=output_format,
         paginate=paginate,
     )
@@ -632,13 +785,7 @@ def create_document(
 ):
     """Create a DOCX document from markdown"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
-
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        api_key = resolve_api_key(api_key)
 
         # Check if markdown_input is a file path
         md_path = Path(markdown_input)
@@ -647,6 +794,8 @@ def create_document(
         else:
             markdown_content = markdown_input
 
+        from datalab_sdk.client import DatalabClient
+
         client = DatalabClient(api_key=api_key, base_url=base_url)
         result = client.create_document(
             markdown=markdown_content,
@@ -667,7 +816,12 @@ def create_document(
 # Workflow commands
 @click.command()
 @click.option("--name", required=True, help="Name of the workflow")
-@click.option("--team_id", required=True, type=int, help="Team ID for the workflow")
+@click.option(
+    "--team_id",
+    required=False,
+    type=int,
+    help="Deprecated, ignored: the team is taken from the API key",
+)
 @click.option(
     "--steps",
     required=True,
@@ -677,20 +831,14 @@ def create_document(
 @click.option("--base_url", default=settings.DATALAB_HOST, help="API base URL")
 def create_workflow(
     name: str,
-    team_id: int,
+    team_id: Optional[int],
     steps: str,
     api_key: Optional[str],
     base_url: str,
 ):
     """Create a new workflow"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
-
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        api_key = resolve_api_key(api_key)
 
         # Parse steps from JSON string or file
         steps_path = Path(steps)
@@ -712,10 +860,10 @@ def create_workflow(
         ]
 
         # Create workflow
+        from datalab_sdk.client import DatalabClient
+
         client = DatalabClient(api_key=api_key, base_url=base_url)
-        workflow = client.create_workflow(
-            name=name, team_id=team_id, steps=workflow_steps
-        )
+        workflow = client.create_workflow(name=name, steps=workflow_steps)
 
         click.echo("Workflow created successfully!")
         click.echo(f"   ID: {workflow.id}")
@@ -738,13 +886,9 @@ def create_workflow(
 def get_workflow(workflow_id: int, api_key: Optional[str], base_url: str):
     """Get a workflow by ID"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
+        api_key = resolve_api_key(api_key)
 
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        from datalab_sdk.client import DatalabClient
 
         client = DatalabClient(api_key=api_key, base_url=base_url)
         workflow = client.get_workflow(workflow_id)
@@ -774,13 +918,9 @@ def get_workflow(workflow_id: int, api_key: Optional[str], base_url: str):
 def get_step_types(api_key: Optional[str], base_url: str):
     """Get all available workflow step types"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
+        api_key = resolve_api_key(api_key)
 
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        from datalab_sdk.client import DatalabClient
 
         client = DatalabClient(api_key=api_key, base_url=base_url)
         response = client.get_step_types()
@@ -815,13 +955,9 @@ def get_step_types(api_key: Optional[str], base_url: str):
 def list_workflows(api_key: Optional[str], base_url: str):
     """List all workflows for your team"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
+        api_key = resolve_api_key(api_key)
 
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        from datalab_sdk.client import DatalabClient
 
         client = DatalabClient(api_key=api_key, base_url=base_url)
         workflows = client.list_workflows()
@@ -861,13 +997,7 @@ def execute_workflow(
 ):
     """Trigger a workflow execution"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
-
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        api_key = resolve_api_key(api_key)
 
         # Parse input_config from JSON string or file
         input_path = Path(input_config)
@@ -886,6 +1016,8 @@ def execute_workflow(
             storage_type=config_data.get("storage_type"),
         )
 
+        from datalab_sdk.client import DatalabClient
+
         client = DatalabClient(api_key=api_key, base_url=base_url)
 
         click.echo(f"Triggering workflow execution for workflow {workflow_id}...")
@@ -947,13 +1079,9 @@ def get_execution_status(
 ):
     """Get the status of a workflow execution"""
     try:
-        if api_key is None:
-            api_key = settings.DATALAB_API_KEY
+        api_key = resolve_api_key(api_key)
 
-        if api_key is None:
-            raise DatalabError(
-                "You must either pass in an api key via --api_key or set the DATALAB_API_KEY env variable."
-            )
+        from datalab_sdk.client import DatalabClient
 
         client = DatalabClient(api_key=api_key, base_url=base_url)
         execution = client.get_execution_status(
@@ -1029,10 +1157,6 @@ def get_execution_status(
 def visualize_workflow(definition: str):
     """Visualize workflow DAG from a JSON definition file"""
     try:
-        import json
-        from pathlib import Path
-        from collections import defaultdict, deque
-
         # Load workflow definition
         definition_path = Path(definition)
         if not definition_path.exists():
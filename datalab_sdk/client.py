@@ -3,11 +3,15 @@ Datalab API client - async core with sync wrapper
 """
 
 import asyncio
+import functools
 import mimetypes
 import os
 import shutil
 import tempfile
+import time
 import warnings
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 
 import aiohttp
 import ijson
@@ -18,6 +22,7 @@ from tenacity import (
     stop_after_attempt,
     wait_exponential_jitter,
 )
+from tenacity.wait import wait_base
 from pathlib import Path
 from typing import Union, Optional, Dict, Any
 
@@ -25,6 +30,7 @@ from datalab_sdk.exceptions import (
     DatalabAPIError,
     DatalabTimeoutError,
     DatalabFileError,
+    DatalabValidationError,
 )
 from datalab_sdk.mimetypes import MIMETYPE_MAP
 from datalab_sdk.models import (
@@ -58,6 +64,69 @@ from datalab_sdk.models import (
 )
 from datalab_sdk.settings import settings
 
+# Polling starts fast and backs off towards poll_interval, so short jobs
+# are picked up quickly without hammering the API on long ones
+INITIAL_POLL_INTERVAL = 0.25
+POLL_BACKOFF_FACTOR = 1.5
+
+
+@functools.lru_cache(maxsize=None)
+def _mime_type_for_suffix(suffix: str) -> str:
+    """Resolve a MIME type from a lowercased file extension, once per extension"""
+    mime_type, _ = mimetypes.guess_type(f"file{suffix}")
+    if not mime_type:
+        mime_type = MIMETYPE_MAP.get(suffix, "application/octet-stream")
+    return mime_type
+
+
+def _readable_file_size(file_path: Path) -> int:
+    """Return the size of a readable regular file, or raise DatalabFileError.
+
+    Payloads open the file lazily while the request is being sent, so
+    unreadable paths are rejected here instead of mid-upload.
+    """
+    try:
+        file_size = file_path.stat().st_size
+    except FileNotFoundError:
+        raise DatalabFileError(f"File not found: {file_path}")
+    if not file_path.is_file():
+        raise DatalabFileError(f"Not a regular file: {file_path}")
+    try:
+        open(file_path, "rb").close()
+    except OSError as e:
+        raise DatalabFileError(f"Cannot read file {file_path}: {e}")
+    return file_size
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class _wait_retry_after(wait_base):
+    """Honor the server's Retry-After, falling back to another wait strategy"""
+
+    def __init__(self, fallback: wait_base, max_wait: float):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state) -> float:
+        exc = retry_state.outcome.exception()
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, self.max_wait)
+        return self.fallback(retry_state)
+
 
 class _AsyncIterableReader:
     """Adapts an async iterable of bytes into an async file-like object for ijson."""
@@ -74,6 +143,50 @@ class _AsyncIterableReader:
             return b""
 
 
+class _FilePathPayload(aiohttp.payload.Payload):
+    """Streams a file from disk in chunks, reopening it on every write.
+
+    aiohttp closes file-object payloads after the first send, which breaks
+    resubmitting the same form on a 429. Holding the path instead keeps the
+    form reusable across retries without buffering the file in memory.
+    """
+
+    _autoclose = True
+    _chunk_size = 2**16
+
+    def __init__(self, file_path: Path, size: int, **kwargs):
+        super().__init__(file_path, **kwargs)
+        self._size = size
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return self._value.read_bytes().decode(encoding, errors)
+
+    async def as_bytes(self, encoding: str = "utf-8", errors: str = "strict") -> bytes:
+        return await asyncio.to_thread(self._value.read_bytes)
+
+    async def write(self, writer) -> None:
+        await self.write_with_length(writer, None)
+
+    async def write_with_length(self, writer, content_length: Optional[int]) -> None:
+        remaining = self._size if content_length is None else content_length
+        fh = await asyncio.to_thread(open, self._value, "rb")
+        try:
+            while remaining > 0:
+                chunk = await asyncio.to_thread(
+                    fh.read, min(self._chunk_size, remaining)
+                )
+                if not chunk:
+                    break
+                await writer.write(chunk)
+                remaining -= len(chunk)
+        finally:
+            fh.close()
+
+
 class AsyncDatalabClient:
     """Asynchronous client for Datalab API"""
 
@@ -82,6 +195,7 @@ class AsyncDatalabClient:
         api_key: str | None = None,
         base_url: str = settings.DATALAB_HOST,
         timeout: int = 300,
+        max_connections: int = 100,
     ):
         """
         Initialize the async Datalab client
@@ -90,15 +204,25 @@ class AsyncDatalabClient:
             api_key: Your Datalab API key
             base_url: Base URL for the API (default: https://www.datalab.to)
             timeout: Default timeout for requests in seconds
+            max_connections: Size of the connection pool; requests beyond
+                this wait for a free connection
         """
         if api_key is None:
             api_key = settings.DATALAB_API_KEY
         if api_key is None:
             raise DatalabAPIError("You must pass in an api_key or set DATALAB_API_KEY.")
 
+        # Fail fast on a malformed host instead of timing out on every request
+        parsed = urlsplit(base_url or "")
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            raise DatalabValidationError(
+                f"Invalid base_url {base_url!r}: expected an http(s):// URL."
+            )
+
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.max_connections = max_connections
         self._session = None
 
     async def __aenter__(self):
@@ -114,7 +238,15 @@ class AsyncDatalabClient:
         """Ensure aiohttp session is created"""
         if self._session is None:
             timeout = aiohttp.ClientTimeout(total=self.timeout)
+            # Keep connections alive between submit and poll requests, and
+            # cache DNS for the lifetime of a typical batch
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
             self._session = aiohttp.ClientSession(
+                connector=connector,
                 timeout=timeout,
                 headers={
                     "X-Api-Key": self.api_key,
@@ -157,6 +289,9 @@ class AsyncDatalabClient:
                 error_message,
                 e.status,
                 error_data if "error_data" in locals() else None,
+                retry_after=_parse_retry_after(
+                    e.headers.get("Retry-After") if e.headers else None
+                ),
             )
         except aiohttp.ClientError as e:
             raise DatalabAPIError(f"Request failed: {str(e)}")
@@ -167,7 +302,7 @@ class AsyncDatalabClient:
             and getattr(e, "status_code", None) == 429
         ),
         stop=stop_after_attempt(10),
-        wait=wait_exponential_jitter(initial=5, max=120),
+        wait=_wait_retry_after(wait_exponential_jitter(initial=5, max=120), 120),
         reraise=True,
     )
     async def _submit_with_retry(self, endpoint: str, data=None, json=None) -> Dict[str, Any]:
@@ -186,14 +321,24 @@ class AsyncDatalabClient:
         poll_interval: int = 1,
         stream_response_to: Optional[Path] = None,
     ) -> Union[Dict[str, Any], FileResult]:
-        """Poll for result completion"""
+        """Poll for result completion
+
+        The wait between polls grows from INITIAL_POLL_INTERVAL up to
+        poll_interval. Polling stops once max_polls attempts have been made
+        and the max_polls * poll_interval time budget has been used.
+        """
         full_url = (
             check_url
             if check_url.startswith("http")
             else f"{self.base_url}/{check_url.lstrip('/')}"
         )
 
-        for i in range(max_polls):
+        deadline = time.monotonic() + max_polls * poll_interval
+        interval = min(INITIAL_POLL_INTERVAL, poll_interval)
+        polls = 0
+
+        while polls < max_polls or time.monotonic() < deadline:
+            polls += 1
             if stream_response_to:
                 result = await self._poll_get_streaming(full_url, stream_response_to)
                 status, success, error = result.status, result.success, result.error
@@ -211,7 +356,8 @@ class AsyncDatalabClient:
                     f"Processing failed: {error or 'Unknown error'}"
                 )
 
-            await asyncio.sleep(poll_interval)
+            await asyncio.sleep(interval)
+            interval = min(poll_interval, interval * POLL_BACKOFF_FACTOR)
 
         raise DatalabTimeoutError(
             f"Polling timed out after {max_polls * poll_interval} seconds"
@@ -236,7 +382,7 @@ class AsyncDatalabClient:
             )
         ),
         stop=stop_after_attempt(10),
-        wait=wait_exponential_jitter(initial=5, max=120),
+        wait=_wait_retry_after(wait_exponential_jitter(initial=5, max=120), 120),
         reraise=True,
     )
     async def _poll_get_with_retry(self, url: str) -> Dict[str, Any]:
@@ -266,7 +412,7 @@ class AsyncDatalabClient:
             )
         ),
         stop=stop_after_attempt(10),
-        wait=wait_exponential_jitter(initial=5, max=120),
+        wait=_wait_retry_after(wait_exponential_jitter(initial=5, max=120), 120),
         reraise=True,
     )
     async def _poll_get_streaming(self, url: str, stream_response_to: Path) -> FileResult:
@@ -296,7 +442,13 @@ class AsyncDatalabClient:
                         )
                     except Exception:
                         error_message = f"HTTP {resp.status}"
-                    raise DatalabAPIError(error_message, resp.status)
+                    raise DatalabAPIError(
+                        error_message,
+                        resp.status,
+                        retry_after=_parse_retry_after(
+                            resp.headers.get("Retry-After")
+                        ),
+                    )
 
                 status = None
                 success = None
@@ -356,27 +508,20 @@ class AsyncDatalabClient:
     def _prepare_file_data(self, file_path: Union[str, Path]) -> tuple:
         """Prepare file data for upload"""
         file_path = Path(file_path)
-
-        if not file_path.exists():
-            raise DatalabFileError(f"File not found: {file_path}")
-
-        # Read file content
-        file_data = file_path.read_bytes()
+        file_size = _readable_file_size(file_path)
 
         # Check if file is empty
-        if not file_data:
+        if not file_size:
             raise DatalabFileError(
                 f"File is empty: {file_path}. Please provide a file with content."
             )
 
-        # Determine MIME type
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        if not mime_type:
-            # Try to detect from extension
-            extension = file_path.suffix.lower()
-            mime_type = MIMETYPE_MAP.get(extension, "application/octet-stream")
+        mime_type = _mime_type_for_suffix(file_path.suffix.lower())
 
-        return file_path.name, file_data, mime_type
+        file_payload = _FilePathPayload(
+            file_path, file_size, filename=file_path.name, content_type=mime_type
+        )
+        return file_path.name, file_payload, mime_type
 
     def get_form_params(self, file_path=None, file_url=None, options=None, require_file=True):
         form_data = aiohttp.FormData()
@@ -1254,8 +1399,19 @@ class AsyncDatalabClient:
         Returns:
             WorkflowExecution object with current status and results.
             Results will contain presigned URLs or downloaded data depending on download_results flag.
+
+        As with job polling, the wait between checks starts at
+        INITIAL_POLL_INTERVAL and grows to poll_interval, so short executions
+        are picked up soon after they finish. Polling continues until
+        max_polls checks have been made and the (max_polls - 1) *
+        poll_interval time budget has been used.
         """
-        for i in range(max_polls):
+        deadline = time.monotonic() + (max_polls - 1) * poll_interval
+        interval = min(INITIAL_POLL_INTERVAL, poll_interval)
+        polls = 0
+
+        while True:
+            polls += 1
             response = await self._make_request(
                 "GET",
                 f"/api/v1/workflows/executions/{execution_id}",
@@ -1306,12 +1462,13 @@ class AsyncDatalabClient:
             if status in ("COMPLETED", "FAILED"):
                 return execution
 
-            # Continue polling if in progress or pending
-            if i < max_polls - 1:
-                await asyncio.sleep(poll_interval)
+            # Return the last status even if not complete once out of budget
+            if polls >= max_polls and time.monotonic() >= deadline:
+                return execution
 
-        # Return the last status even if not complete (after max_polls)
-        return execution
+            # Continue polling if in progress or pending
+            await asyncio.sleep(interval)
+            interval = min(poll_interval, interval * POLL_BACKOFF_FACTOR)
 
     async def _download_step_results(self, steps_data: dict) -> dict:
         """
@@ -1388,15 +1545,9 @@ class AsyncDatalabClient:
             UploadedFileMetadata object with file information including file_id and reference
         """
         file_path = Path(file_path)
+        file_size = _readable_file_size(file_path)
 
-        if not file_path.exists():
-            raise DatalabFileError(f"File not found: {file_path}")
-
-        # Determine content type
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        if not mime_type:
-            extension = file_path.suffix.lower()
-            mime_type = MIMETYPE_MAP.get(extension, "application/octet-stream")
+        mime_type = _mime_type_for_suffix(file_path.suffix.lower())
 
         # Step 1: Request presigned upload URL
         response = await self._make_request(
@@ -1414,14 +1565,19 @@ class AsyncDatalabClient:
 
         # Step 2: Upload file to presigned URL
         try:
-            file_data = file_path.read_bytes()
-            async with aiohttp.ClientSession() as session:
-                async with session.put(
-                    upload_url,
-                    data=file_data,
-                    headers={"Content-Type": mime_type},
-                ) as upload_response:
-                    upload_response.raise_for_status()
+            await self._ensure_session()
+            # Share the connection pool, but not the API key headers, with
+            # the presigned storage upload
+            with open(file_path, "rb") as file_data:
+                async with aiohttp.ClientSession(
+                    connector=self._session.connector, connector_owner=False
+                ) as session:
+                    async with session.put(
+                        upload_url,
+                        data=file_data,
+                        headers={"Content-Type": mime_type},
+                    ) as upload_response:
+                        upload_response.raise_for_status()
         except Exception as e:
             raise DatalabFileError(f"Failed to upload file to storage: {str(e)}")
 
@@ -1441,7 +1597,7 @@ class AsyncDatalabClient:
             content_type=mime_type,
             reference=reference,
             upload_status="completed",
-            file_size=file_path.stat().st_size,
+            file_size=file_size,
             created=confirm_response.get("created"),
         )
 
@@ -2165,6 +2321,7 @@ class DatalabClient:
         api_key: str | None = None,
         base_url: str = settings.DATALAB_HOST,
         timeout: int = 300,
+        max_connections: int = 100,
     ):
         """
         Initialize the Datalab client
@@ -2173,11 +2330,41 @@ class DatalabClient:
             api_key: Your Datalab API key
             base_url: Base URL for the API (default: https://www.datalab.to)
             timeout: Default timeout for requests in seconds
+            max_connections: Size of the connection pool
+        """
+        self._async_client = AsyncDatalabClient(
+            api_key, base_url, timeout, max_connections
+        )
+        self._loop = None
+
+    def __enter__(self):
+        """Context manager entry: keep one session open across calls"""
+        # Re-entering reuses the private loop rather than leaking it
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._async_client._ensure_session())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
+    def close(self):
+        """Close the session opened by the context manager.
+
+        Outside a ``with`` block each call opens and closes its own session,
+        so there is nothing left to release and this is a no-op.
         """
-        self._async_client = AsyncDatalabClient(api_key, base_url, timeout)
+        if self._loop is not None:
+            self._loop.run_until_complete(self._async_client.close())
+            self._loop.close()
+            self._loop = None
 
     def _run_async(self, coro):
         """Run async coroutine in sync context"""
+        if self._loop is not None:
+            # Inside a `with` block the session stays open between calls
+            return self._loop.run_until_complete(coro)
         try:
             loop = asyncio.get_event_loop()
             return loop.run_until_complete(self._async_wrapper(coro))
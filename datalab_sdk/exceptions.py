@@ -13,11 +13,17 @@ class DatalabAPIError(DatalabError):
     """Exception raised when the API returns an error response"""
 
     def __init__(
-        self, message: str, status_code: int = None, response_data: dict = None
+        self,
+        message: str,
+        status_code: int = None,
+        response_data: dict = None,
+        retry_after: float = None,
     ):
         super().__init__(message)
         self.status_code = status_code
         self.response_data = response_data
+        # Seconds the server asked us to wait (Retry-After header), if any
+        self.retry_after = retry_after
 
 
 class DatalabTimeoutError(DatalabError):
@@ -2,13 +2,21 @@
 Datalab SDK data models
 """
 
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Union, Literal
 from pathlib import Path
 import json
 import base64
 
 
+@lru_cache(maxsize=None)
+def _form_field_names(cls) -> tuple:
+    """Field names of an options dataclass, resolved once per class"""
+    return tuple(f.name for f in fields(cls))
+
+
 @dataclass
 class ProcessingOptions:
     # Common options
@@ -21,14 +29,14 @@ class ProcessingOptions:
         form_data = {}
 
         # Add non-None values
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, bool):
-                    form_data[key] = (None, value)
-                elif isinstance(value, (dict, list)):
-                    form_data[key] = (None, json.dumps(value, indent=2))
-                else:
-                    form_data[key] = (None, value)
+        for key in _form_field_names(type(self)):
+            value = getattr(self, key)
+            if value is None:
+                continue
+            if isinstance(value, (dict, list)):
+                form_data[key] = (None, json.dumps(value))
+            else:
+                form_data[key] = (None, value)
 
         return form_data
 
@@ -63,13 +71,11 @@ class ConvertOptions(ProcessingOptions):
         # Remove keep_spreadsheet_formatting from top-level (it goes in additional_config)
         form_data.pop("keep_spreadsheet_formatting", None)
 
-        additional_config_dict = {}
-        if self.additional_config:
-            additional_config_dict.update(self.additional_config)
+        # The parent already encoded additional_config as-is; only re-encode
+        # when keep_spreadsheet_formatting has to be merged into it
         if self.keep_spreadsheet_formatting:
+            additional_config_dict = dict(self.additional_config or {})
             additional_config_dict["keep_spreadsheet_formatting"] = True
-
-        if additional_config_dict:
             form_data["additional_config"] = (None, json.dumps(additional_config_dict))
 
         return form_data
@@ -220,13 +226,13 @@ class ConversionResult:
 
         if self.json:
             with open(output_path.with_suffix(".json"), "w", encoding="utf-8") as f:
-                json.dump(self.json, f, indent=2)
+                f.write(json.dumps(self.json, indent=2, ensure_ascii=False))
 
         if self.chunks:
             with open(
                 output_path.with_suffix(".chunks.json"), "w", encoding="utf-8"
             ) as f:
-                json.dump(self.chunks, f, indent=2)
+                f.write(json.dumps(self.chunks, indent=2, ensure_ascii=False))
 
         if self.extraction_schema_json:
             with open(
@@ -241,17 +247,21 @@ class ConversionResult:
             images_dir = output_path.parent
             images_dir.mkdir(exist_ok=True)
 
-            for filename, base64_data in self.images.items():
-                image_path = images_dir / filename
-                with open(image_path, "wb") as f:
+            def save_image(item):
+                filename, base64_data = item
+                with open(images_dir / filename, "wb") as f:
                     f.write(base64.b64decode(base64_data))
 
+            # Images are independent, so decode and write them concurrently
+            with ThreadPoolExecutor(max_workers=min(8, len(self.images))) as pool:
+                list(pool.map(save_image, self.images.items()))
+
         # Save metadata if present
         if self.metadata:
             with open(
                 output_path.with_suffix(".metadata.json"), "w", encoding="utf-8"
             ) as f:
-                json.dump(self.metadata, f, indent=2)
+                f.write(json.dumps(self.metadata, indent=2, ensure_ascii=False))
 
 
 @dataclass
@@ -372,7 +382,7 @@ class WorkflowExecution:
         }
 
         with open(output_path.with_suffix(".json"), "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2)
+            f.write(json.dumps(output_data, indent=2, ensure_ascii=False))
 
 
 @dataclass
@@ -410,35 +420,37 @@ class OCRResult:
                 return "\n".join([line["text"] for line in page.get("text_lines", [])])
             return ""
         else:
-            # Get all text
-            all_text = []
-            for page in self.pages:
-                page_text = "\n".join(
-                    [line["text"] for line in page.get("text_lines", [])]
-                )
-                all_text.append(page_text)
-            return "\n\n".join(all_text)
+            # Get all text. List comprehensions rather than generators:
+            # str.join materializes its argument anyway, so a list is faster
+            return "\n\n".join(
+                [
+                    "\n".join([line["text"] for line in page.get("text_lines", [])])
+                    for page in self.pages
+                ]
+            )
 
     def save_output(self, output_path: Union[str, Path]) -> None:
         """Save the OCR output to a text file"""
         output_path = Path(output_path)
 
-        # Save as text file
+        # Save the extracted text; the full page data goes in .ocr.json below
         with open(output_path.with_suffix(".txt"), "w", encoding="utf-8") as f:
-            json.dump(self.pages, f, indent=2)
+            f.write(self.get_text())
 
         # Save detailed OCR data as JSON
         with open(output_path.with_suffix(".ocr.json"), "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "success": self.success,
-                    "pages": self.pages,
-                    "error": self.error,
-                    "page_count": self.page_count,
-                    "status": self.status,
-                },
-                f,
-                indent=2,
+            f.write(
+                json.dumps(
+                    {
+                        "success": self.success,
+                        "pages": self.pages,
+                        "error": self.error,
+                        "page_count": self.page_count,
+                        "status": self.status,
+                    },
+                    indent=2,
+                    ensure_ascii=False,
+                )
             )
 
 
@@ -500,7 +512,7 @@ class FormFillingResult:
         with open(
             output_path.with_suffix(".metadata.json"), "w", encoding="utf-8"
         ) as f:
-            json.dump(metadata, f, indent=2)
+            f.write(json.dumps(metadata, indent=2, ensure_ascii=False))
 
 
 @dataclass
@@ -2,30 +2,41 @@
 Simple tests for the CLI module
 """
 
-from unittest.mock import patch
-import tempfile
+from unittest.mock import patch, AsyncMock
+import asyncio
 import os
+import shutil
 from click.testing import CliRunner
 
-from datalab_sdk.cli import cli
+from datalab_sdk.cli import (
+    cli,
+    process_files_async,
+    find_files_in_directory,
+    parse_extensions,
+    AsyncRateLimiter,
+    is_transient_error,
+    ProcessedFile,
+)
+from datalab_sdk.exceptions import DatalabAPIError
+from datalab_sdk.models import ConversionResult, Workflow
 from datalab_sdk.settings import settings
 
 
 ASYNC_RETURN_VALUE = [
-    {
-        "success": True,
-        "file_path": "/tmp/test1.pdf",
-        "output_path": "/tmp/output/test1.txt",
-        "error": None,
-        "page_count": 2,
-    },
-    {
-        "success": True,
-        "file_path": "/tmp/test2.pdf",
-        "output_path": "/tmp/output/test2.txt",
-        "error": None,
-        "page_count": 1,
-    },
+    ProcessedFile(
+        success=True,
+        file_path="/tmp/test1.pdf",
+        output_path="/tmp/output/test1.txt",
+        error=None,
+        page_count=2,
+    ),
+    ProcessedFile(
+        success=True,
+        file_path="/tmp/test2.pdf",
+        output_path="/tmp/output/test2.txt",
+        error=None,
+        page_count=1,
+    ),
 ]
 
 
@@ -33,74 +44,303 @@ class TestConvertCommand:
     """Test the convert command"""
 
     @patch("datalab_sdk.cli.asyncio.run")
-    def test_convert_successful_single_file(self, mock_client_class):
+    def test_convert_successful_single_file(
+        self, mock_client_class, sample_pdf_file, temp_dir
+    ):
         """Test successful conversion of a single file"""
         # Mock the client
         mock_client_class.return_value = ASYNC_RETURN_VALUE
 
         runner = CliRunner()
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
-            try:
-                result = runner.invoke(
-                    cli,
-                    [
-                        "convert",
-                        tmp_file.name,
-                        "--api_key",
-                        "test-key",
-                        "--output_dir",
-                        "/tmp/output",
-                    ],
-                )
-
-                assert result.exit_code == 0
-                assert "Successfully processed" in result.output
-
-                # Verify client was called correctly
-                mock_client_class.assert_called_once()
-
-            finally:
-                os.unlink(tmp_file.name)
+        result = runner.invoke(
+            cli,
+            [
+                "convert",
+                str(sample_pdf_file),
+                "--api_key",
+                "test-key",
+                "--output_dir",
+                str(temp_dir / "output"),
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "Successfully processed" in result.output
+
+        # Verify client was called correctly
+        mock_client_class.assert_called_once()
 
     @patch("datalab_sdk.cli.asyncio.run")
-    def test_convert_with_env_var(self, mock_client_class):
+    def test_convert_with_env_var(self, mock_client_class, sample_pdf_file, temp_dir):
         """Test convert command using environment variable for API key"""
 
         mock_client_class.return_value = ASYNC_RETURN_VALUE
 
         runner = CliRunner()
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
-            try:
-                # Set environment variable
-                settings.DATALAB_API_KEY = "env-api-key"
-                result = runner.invoke(
-                    cli, ["convert", tmp_file.name, "--output_dir", "/tmp/output"]
-                )
-                settings.DATALAB_API_KEY = None
-
-                assert result.exit_code == 0
-                assert "Successfully processed" in result.output
+        # Set environment variable
+        settings.DATALAB_API_KEY = "env-api-key"
+        try:
+            result = runner.invoke(
+                cli,
+                [
+                    "convert",
+                    str(sample_pdf_file),
+                    "--output_dir",
+                    str(temp_dir / "output"),
+                ],
+            )
+        finally:
+            settings.DATALAB_API_KEY = None
 
-            finally:
-                os.unlink(tmp_file.name)
+        assert result.exit_code == 0
+        assert "Successfully processed" in result.output
 
     @patch("datalab_sdk.cli.asyncio.run")
-    def test_convert_missing_api_key(self, mock_client_class):
+    def test_convert_missing_api_key(
+        self, mock_client_class, sample_pdf_file, temp_dir
+    ):
         """Test convert command with missing API key"""
 
         mock_client_class.return_value = ASYNC_RETURN_VALUE
 
         runner = CliRunner()
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
-            try:
-                # Clear environment variable
-                with patch.dict(os.environ, {}, clear=True):
-                    result = runner.invoke(
-                        cli, ["convert", tmp_file.name, "--output_dir", "/tmp/output"]
-                    )
-
-                    assert result.exit_code == 1
-                    assert "You must either pass in an api key" in result.output
-
-            finally:
-                os.unlink(tmp_file.name)
+        # Clear environment variable
+        with patch.dict(os.environ, {}, clear=True):
+            result = runner.invoke(
+                cli,
+                [
+                    "convert",
+                    str(sample_pdf_file),
+                    "--output_dir",
+                    str(temp_dir / "output"),
+                ],
+            )
+
+            assert result.exit_code == 1
+            assert "You must either pass in an api key" in result.output
+
+    @patch("datalab_sdk.cli.process_files_async", new_callable=AsyncMock)
+    def test_convert_forwards_max_retries(
+        self, mock_process, sample_pdf_file, temp_dir
+    ):
+        """--max_retries reaches the batch processor"""
+        mock_process.return_value = ASYNC_RETURN_VALUE
+
+        result = CliRunner().invoke(
+            cli,
+            [
+                "convert",
+                str(sample_pdf_file),
+                "--api_key",
+                "test-key",
+                "--output_dir",
+                str(temp_dir / "out"),
+                "--max_retries",
+                "7",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert mock_process.await_args.kwargs["max_retries"] == 7
+
+
+class TestProcessFilesAsync:
+    """Test the batch processing helper"""
+
+    @patch("datalab_sdk.client.AsyncDatalabClient")
+    def test_single_client_shared_across_files(
+        self, mock_client_class, sample_pdf_file, temp_dir
+    ):
+        """One client (and connection pool) is opened for the whole batch"""
+        client = mock_client_class.return_value.__aenter__.return_value
+        client.convert = AsyncMock(
+            return_value=ConversionResult(
+                success=True, output_format="markdown", markdown="# Hi", page_count=1
+            )
+        )
+
+        files = []
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            path = temp_dir / name
+            shutil.copyfile(sample_pdf_file, path)
+            files.append(path)
+
+        results = asyncio.run(
+            process_files_async(
+                files, temp_dir, "convert", api_key="test-key", base_url="http://x"
+            )
+        )
+
+        assert len(results) == 3
+        assert all(r.success for r in results)
+        mock_client_class.assert_called_once()
+        assert client.convert.await_count == 3
+        for name in ("a", "b", "c"):
+            assert (temp_dir / name / f"{name}.md").read_text() == "# Hi"
+
+    @patch("datalab_sdk.client.AsyncDatalabClient")
+    def test_batch_larger_than_task_window(self, mock_client_class, temp_dir):
+        """Files beyond the in-flight window are still all processed"""
+        client = mock_client_class.return_value.__aenter__.return_value
+        client.convert = AsyncMock(
+            return_value=ConversionResult(success=False, output_format="markdown")
+        )
+        files = [temp_dir / f"doc{i}.pdf" for i in range(7)]
+
+        results = asyncio.run(
+            process_files_async(
+                files,
+                temp_dir,
+                "convert",
+                max_concurrent=1,
+                api_key="test-key",
+                base_url="http://x",
+                max_fs_concurrent=1,
+            )
+        )
+
+        assert sorted(r.file_path for r in results) == sorted(map(str, files))
+        assert client.convert.await_count == 7
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("datalab_sdk.client.AsyncDatalabClient")
+    def test_transient_errors_are_retried(self, mock_client_class, _, temp_dir):
+        """Gateway errors are retried, other API errors fail immediately"""
+        client = mock_client_class.return_value.__aenter__.return_value
+        client.convert = AsyncMock(
+            side_effect=[
+                DatalabAPIError("Bad gateway", 502),
+                ConversionResult(success=True, output_format="markdown"),
+                DatalabAPIError("Bad request", 400),
+            ]
+        )
+        good = temp_dir / "good.pdf"
+        bad = temp_dir / "bad.pdf"
+
+        results = asyncio.run(
+            process_files_async(
+                [good], temp_dir, "convert", api_key="test-key", base_url="http://x"
+            )
+        )
+        assert results[0].success is True
+        assert client.convert.await_count == 2
+
+        results = asyncio.run(
+            process_files_async(
+                [bad], temp_dir, "convert", api_key="test-key", base_url="http://x"
+            )
+        )
+        assert results[0].success is False
+        assert results[0].error == "Bad request"
+        assert client.convert.await_count == 3
+
+    def test_rate_limits_are_left_to_the_client(self):
+        """429s are retried inside the client, not by resubmitting the file"""
+        assert is_transient_error(DatalabAPIError("Bad gateway", 502))
+        assert not is_transient_error(DatalabAPIError("Too many requests", 429))
+
+
+class TestAsyncRateLimiter:
+    """Test the CLI request rate limiter"""
+
+    def test_spaces_out_acquisitions(self):
+        """Successive acquisitions are at least 1/rps apart"""
+
+        async def run():
+            limiter = AsyncRateLimiter(rps=20)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(3):
+                await limiter.acquire()
+            return loop.time() - start
+
+        assert asyncio.run(run()) >= 0.1
+
+    def test_no_limit_when_rps_unset(self):
+        """A limiter without rps never sleeps"""
+
+        async def run():
+            limiter = AsyncRateLimiter()
+            with patch("datalab_sdk.cli.asyncio.sleep") as mock_sleep:
+                for _ in range(5):
+                    await limiter.acquire()
+            return mock_sleep.call_count
+
+        assert asyncio.run(run()) == 0
+
+
+class TestFindFilesInDirectory:
+    """Test directory scanning"""
+
+    def test_recurses_and_filters_by_extension(self, temp_dir):
+        """Nested files are found and unsupported extensions skipped"""
+        (temp_dir / "nested" / "deeper").mkdir(parents=True)
+        (temp_dir / "a.pdf").write_bytes(b"x")
+        (temp_dir / "nested" / "b.PNG").write_bytes(b"x")
+        (temp_dir / "nested" / "deeper" / "c.docx").write_bytes(b"x")
+        (temp_dir / "nested" / "notes.txt").write_bytes(b"x")
+        (temp_dir / ".pdf").write_bytes(b"x")
+
+        found = sorted(p.name for p in find_files_in_directory(temp_dir))
+        assert found == ["a.pdf", "b.PNG", "c.docx"]
+
+        found = find_files_in_directory(temp_dir, [".pdf"])
+        assert [p.name for p in found] == ["a.pdf"]
+
+    def test_skips_unreadable_subdirectory(self, temp_dir):
+        """A directory that cannot be listed is skipped, not fatal"""
+        (temp_dir / "locked").mkdir()
+        (temp_dir / "locked" / "hidden.pdf").write_bytes(b"x")
+        (temp_dir / "a.pdf").write_bytes(b"x")
+        locked = str(temp_dir / "locked")
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if path == locked:
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        with patch("datalab_sdk.cli.os.scandir", side_effect=scandir):
+            found = find_files_in_directory(temp_dir)
+
+        assert [p.name for p in found] == ["a.pdf"]
+
+    def test_parse_extensions_normalizes(self, temp_dir):
+        """Parsed extensions are dotted, lowercased and usable for scanning"""
+        assert parse_extensions(None) is None
+        extensions = parse_extensions(" PDF, .Docx")
+        assert extensions == frozenset({".pdf", ".docx"})
+
+        (temp_dir / "a.PDF").write_bytes(b"x")
+        (temp_dir / "b.png").write_bytes(b"x")
+        found = find_files_in_directory(temp_dir, extensions)
+        assert [p.name for p in found] == ["a.PDF"]
+
+
+class TestCreateWorkflowCommand:
+    """Test the create-workflow command"""
+
+    @patch("datalab_sdk.client.DatalabClient")
+    def test_create_workflow_builds_steps(self, mock_client_class):
+        """Steps JSON is turned into WorkflowStep objects and submitted"""
+        client = mock_client_class.return_value
+        client.create_workflow.return_value = Workflow(
+            id=7, name="wf", team_id=1, steps=[]
+        )
+        steps = (
+            '[{"step_key": "marker_parse", "unique_name": "parse", "settings": {}},'
+            ' {"step_key": "marker_extract", "unique_name": "extract",'
+            ' "settings": {}, "depends_on": ["parse"]}]'
+        )
+
+        result = CliRunner().invoke(
+            cli,
+            ["create-workflow", "--name", "wf", "--steps", steps, "--api_key", "k"],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "ID: 7" in result.output
+        kwargs = client.create_workflow.call_args.kwargs
+        assert kwargs["name"] == "wf"
+        assert [s.unique_name for s in kwargs["steps"]] == ["parse", "extract"]
+        assert kwargs["steps"][1].depends_on == ["parse"]
@@ -6,6 +6,9 @@ import warnings
 import pytest
 from unittest.mock import patch, AsyncMock
 import json
+import base64
+import subprocess
+import sys
 
 from datalab_sdk import DatalabClient, AsyncDatalabClient
 from datalab_sdk.models import (
@@ -31,23 +34,31 @@ from datalab_sdk.exceptions import (
     DatalabAPIError,
     DatalabFileError,
     DatalabTimeoutError,
+    DatalabValidationError,
 )
 
 
+# Submit responses shared by tests that don't care about the request id
+CONVERT_INITIAL_RESPONSE = {
+    "success": True,
+    "request_id": "test-request-id",
+    "request_check_url": "https://api.datalab.to/api/v1/convert/test-request-id",
+}
+
+OCR_INITIAL_RESPONSE = {
+    "success": True,
+    "request_id": "test-ocr-request-id",
+    "request_check_url": "https://api.datalab.to/api/v1/ocr/test-ocr-request-id",
+}
+
+
 class TestConvertMethod:
     """Test the convert method"""
 
     @pytest.mark.asyncio
-    async def test_convert_basic_success(self, temp_dir):
+    async def test_convert_basic_success(self, sample_pdf_file):
         """Test basic successful conversion"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
-        mock_initial_response = {
-            "success": True,
-            "request_id": "test-request-id",
-            "request_check_url": "https://api.datalab.to/api/v1/convert/test-request-id",
-        }
+        mock_initial_response = CONVERT_INITIAL_RESPONSE
 
         mock_result_response = {
             "success": True,
@@ -63,36 +74,29 @@ class TestConvertMethod:
         }
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.convert(pdf_file)
+                result = await client.convert(sample_pdf_file)
 
-                    assert isinstance(result, ConversionResult)
-                    assert result.success is True
-                    assert (
-                        result.markdown == "# Test Document\n\nThis is a test document."
-                    )
-                    assert result.page_count == 1
-                    assert result.output_format == "markdown"
+                assert isinstance(result, ConversionResult)
+                assert result.success is True
+                assert result.markdown == "# Test Document\n\nThis is a test document."
+                assert result.page_count == 1
+                assert result.output_format == "markdown"
 
     @pytest.mark.asyncio
-    async def test_convert_with_save_output(self, temp_dir):
+    async def test_convert_with_save_output(self, sample_pdf_file, temp_dir):
         """Test conversion with automatic saving"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
-        mock_initial_response = {
-            "success": True,
-            "request_id": "test-request-id",
-            "request_check_url": "https://api.datalab.to/api/v1/convert/test-request-id",
-        }
+        mock_initial_response = CONVERT_INITIAL_RESPONSE
 
         mock_result_response = {
             "success": True,
@@ -111,42 +115,35 @@ class TestConvertMethod:
         output_path = temp_dir / "output" / "result"
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.convert(pdf_file, save_output=output_path)
+                result = await client.convert(sample_pdf_file, save_output=output_path)
 
-                    assert result.success is True
-                    assert (output_path.with_suffix(".md")).exists()
-                    saved_content = (output_path.with_suffix(".md")).read_text()
-                    assert (
-                        saved_content == "# Test Document\n\nThis is a test document."
-                    )
+                assert result.success is True
+                md_file = output_path.with_suffix(".md")
+                assert md_file.exists()
+                saved_content = md_file.read_text()
+                assert saved_content == "# Test Document\n\nThis is a test document."
 
-                    assert (output_path.with_suffix(".chunks.json")).exists()
-                    saved_chunks = json.loads(
-                        (output_path.with_suffix(".chunks.json")).read_text()
-                    )
-                    assert saved_chunks == {"some_content": True}
+                chunks_file = output_path.with_suffix(".chunks.json")
+                assert chunks_file.exists()
+                saved_chunks = json.loads(chunks_file.read_bytes())
+                assert saved_chunks == {"some_content": True}
 
-    def test_convert_sync_with_processing_options(self, temp_dir):
+    def test_convert_sync_with_processing_options(self, sample_pdf_file):
         """Test synchronous conversion with processing options"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         options = ConvertOptions(output_format="html", max_pages=5)
 
-        mock_initial_response = {
-            "success": True,
-            "request_id": "test-request-id",
-            "request_check_url": "https://api.datalab.to/api/v1/convert/test-request-id",
-        }
+        mock_initial_response = CONVERT_INITIAL_RESPONSE
 
         mock_result_response = {
             "success": True,
@@ -163,28 +160,27 @@ class TestConvertMethod:
 
         client = DatalabClient(api_key="test-key")
 
-        with patch.object(
-            client._async_client, "_make_request", new_callable=AsyncMock
-        ) as mock_request:
-            with patch.object(
+        with (
+            patch.object(
+                client._async_client, "_make_request", new_callable=AsyncMock
+            ) as mock_request,
+            patch.object(
                 client._async_client, "_poll_result", new_callable=AsyncMock
-            ) as mock_poll:
-                mock_request.return_value = mock_initial_response
-                mock_poll.return_value = mock_result_response
+            ) as mock_poll,
+        ):
+            mock_request.return_value = mock_initial_response
+            mock_poll.return_value = mock_result_response
 
-                result = client.convert(pdf_file, options=options)
+            result = client.convert(sample_pdf_file, options=options)
 
-                assert isinstance(result, ConversionResult)
-                assert result.success is True
-                assert result.html == "<h1>Test Document</h1>"
-                assert result.output_format == "html"
+            assert isinstance(result, ConversionResult)
+            assert result.success is True
+            assert result.html == "<h1>Test Document</h1>"
+            assert result.output_format == "html"
 
     @pytest.mark.asyncio
-    async def test_convert_async_respects_polling_params(self, temp_dir):
+    async def test_convert_async_respects_polling_params(self, sample_pdf_file):
         """Verify convert passes max_polls and poll_interval to poller"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         mock_initial_response = {
             "success": True,
             "request_id": "rid-1",
@@ -199,37 +195,38 @@ class TestConvertMethod:
         }
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_req:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_req,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_req.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
-
-                    max_polls = 7
-                    poll_interval = 3
-                    await client.convert(
-                        pdf_file, max_polls=max_polls, poll_interval=poll_interval
-                    )
+                ) as mock_poll,
+            ):
+                mock_req.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    mock_poll.assert_awaited_once()
-                    args, kwargs = mock_poll.await_args
-                    assert args[0] == mock_initial_response["request_check_url"]
-                    assert kwargs["max_polls"] == max_polls
-                    assert kwargs["poll_interval"] == poll_interval
+                max_polls = 7
+                poll_interval = 3
+                await client.convert(
+                    sample_pdf_file,
+                    max_polls=max_polls,
+                    poll_interval=poll_interval,
+                )
+
+                mock_poll.assert_awaited_once()
+                args, kwargs = mock_poll.await_args
+                assert args[0] == mock_initial_response["request_check_url"]
+                assert kwargs["max_polls"] == max_polls
+                assert kwargs["poll_interval"] == poll_interval
 
 
 class TestExtractMethod:
     """Test the extract method"""
 
     @pytest.mark.asyncio
-    async def test_extract_with_file(self, temp_dir):
+    async def test_extract_with_file(self, sample_pdf_file):
         """Test extraction with file input"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         mock_initial_response = {
             "success": True,
             "request_id": "extract-id",
@@ -249,20 +246,22 @@ class TestExtractMethod:
         )
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.extract(pdf_file, options=options)
+                result = await client.extract(sample_pdf_file, options=options)
 
-                    assert isinstance(result, ConversionResult)
-                    assert result.success is True
-                    assert result.extraction_schema_json == '{"name": "John"}'
+                assert isinstance(result, ConversionResult)
+                assert result.success is True
+                assert result.extraction_schema_json == '{"name": "John"}'
 
     @pytest.mark.asyncio
     async def test_extract_with_checkpoint(self):
@@ -286,19 +285,21 @@ class TestExtractMethod:
         )
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.extract(options=options)
+                result = await client.extract(options=options)
 
-                    assert result.success is True
-                    assert result.extraction_schema_json == '{"name": "Jane"}'
+                assert result.success is True
+                assert result.extraction_schema_json == '{"name": "Jane"}'
 
     @pytest.mark.asyncio
     async def test_extract_requires_options(self):
@@ -322,11 +323,8 @@ class TestSegmentMethod:
     """Test the segment method"""
 
     @pytest.mark.asyncio
-    async def test_segment_with_file(self, temp_dir):
+    async def test_segment_with_file(self, sample_pdf_file):
         """Test segmentation with file input"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         mock_initial_response = {
             "success": True,
             "request_id": "segment-id",
@@ -348,32 +346,31 @@ class TestSegmentMethod:
         )
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.segment(pdf_file, options=options)
+                result = await client.segment(sample_pdf_file, options=options)
 
-                    assert isinstance(result, ConversionResult)
-                    assert result.success is True
-                    assert result.segmentation_results is not None
-                    assert len(result.segmentation_results["segments"]) == 1
+                assert isinstance(result, ConversionResult)
+                assert result.success is True
+                assert result.segmentation_results is not None
+                assert len(result.segmentation_results["segments"]) == 1
 
 
 class TestCustomPipelineMethod:
     """Test the run_custom_pipeline method"""
 
     @pytest.mark.asyncio
-    async def test_run_custom_pipeline(self, temp_dir):
+    async def test_run_custom_pipeline(self, sample_pdf_file):
         """Test custom pipeline execution"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         mock_initial_response = {
             "success": True,
             "request_id": "cp-id",
@@ -394,20 +391,24 @@ class TestCustomPipelineMethod:
         )
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.run_custom_pipeline(pdf_file, options=options)
+                result = await client.run_custom_pipeline(
+                    sample_pdf_file, options=options
+                )
 
-                    assert result.success is True
-                    assert result.markdown == "# Custom Output"
-                    assert result.evaluation is not None
+                assert result.success is True
+                assert result.markdown == "# Custom Output"
+                assert result.evaluation is not None
 
 
 class TestTrackChangesMethod:
@@ -434,19 +435,21 @@ class TestTrackChangesMethod:
         }
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.track_changes(docx_file)
+                result = await client.track_changes(docx_file)
 
-                    assert result.success is True
-                    assert "<ins>" in result.markdown
+                assert result.success is True
+                assert "<ins>" in result.markdown
 
 
 class TestCreateDocumentMethod:
@@ -470,44 +473,37 @@ class TestCreateDocumentMethod:
         }
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    result = await client.create_document(
-                        markdown="# Hello World"
-                    )
+                result = await client.create_document(markdown="# Hello World")
 
-                    assert isinstance(result, CreateDocumentResult)
-                    assert result.success is True
-                    assert result.output_format == "docx"
-                    assert result.output_base64 is not None
+                assert isinstance(result, CreateDocumentResult)
+                assert result.success is True
+                assert result.output_format == "docx"
+                assert result.output_base64 is not None
 
-                    # Verify JSON body was sent (not form data)
-                    call_args = mock_request.call_args
-                    assert call_args[1].get("json") is not None
-                    assert call_args[1]["json"]["markdown"] == "# Hello World"
+                # Verify JSON body was sent (not form data)
+                call_args = mock_request.call_args
+                assert call_args[1].get("json") is not None
+                assert call_args[1]["json"]["markdown"] == "# Hello World"
 
 
 class TestOCRMethod:
     """Test the ocr method (deprecated)"""
 
     @pytest.mark.asyncio
-    async def test_ocr_basic_success(self, temp_dir):
+    async def test_ocr_basic_success(self, sample_pdf_file):
         """Test basic successful OCR"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
-        mock_initial_response = {
-            "success": True,
-            "request_id": "test-ocr-request-id",
-            "request_check_url": "https://api.datalab.to/api/v1/ocr/test-ocr-request-id",
-        }
+        mock_initial_response = OCR_INITIAL_RESPONSE
 
         mock_result_response = {
             "success": True,
@@ -531,38 +527,34 @@ class TestOCRMethod:
         }
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
-
-                    with warnings.catch_warnings(record=True) as w:
-                        warnings.simplefilter("always")
-                        result = await client.ocr(pdf_file)
-                        assert len(w) == 1
-                        assert issubclass(w[0].category, DeprecationWarning)
-                        assert "deprecated" in str(w[0].message).lower()
-
-                    assert isinstance(result, OCRResult)
-                    assert result.success is True
-                    assert len(result.pages) == 1
-                    assert result.page_count == 1
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
+
+                with warnings.catch_warnings(record=True) as w:
+                    warnings.simplefilter("always")
+                    result = await client.ocr(sample_pdf_file)
+                    assert len(w) == 1
+                    assert issubclass(w[0].category, DeprecationWarning)
+                    assert "deprecated" in str(w[0].message).lower()
+
+                assert isinstance(result, OCRResult)
+                assert result.success is True
+                assert len(result.pages) == 1
+                assert result.page_count == 1
 
     @pytest.mark.asyncio
-    async def test_ocr_with_save_output(self, temp_dir):
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    async def test_ocr_with_save_output(self, sample_pdf_file, temp_dir):
         """Test OCR with automatic saving"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
-        mock_initial_response = {
-            "success": True,
-            "request_id": "test-ocr-request-id",
-            "request_check_url": "https://api.datalab.to/api/v1/ocr/test-ocr-request-id",
-        }
+        mock_initial_response = OCR_INITIAL_RESPONSE
 
         mock_result_response = {
             "success": True,
@@ -584,39 +576,33 @@ class TestOCRMethod:
         output_path = temp_dir / "output" / "ocr_result"
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(
-                client, "_make_request", new_callable=AsyncMock
-            ) as mock_request:
-                with patch.object(
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch.object(
                     client, "_poll_result", new_callable=AsyncMock
-                ) as mock_poll:
-                    mock_request.return_value = mock_initial_response
-                    mock_poll.return_value = mock_result_response
+                ) as mock_poll,
+            ):
+                mock_request.return_value = mock_initial_response
+                mock_poll.return_value = mock_result_response
 
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore", DeprecationWarning)
-                        result = await client.ocr(pdf_file, save_output=output_path)
+                result = await client.ocr(sample_pdf_file, save_output=output_path)
 
-                    assert result.success is True
+                assert result.success is True
 
-                    text_file = output_path.with_suffix(".txt")
-                    assert text_file.exists()
+                text_file = output_path.with_suffix(".txt")
+                assert text_file.read_text() == "Line 1\nLine 2"
 
-                    json_file = output_path.with_suffix(".ocr.json")
-                    assert json_file.exists()
-                    saved_json = json.loads(json_file.read_text())
-                    assert saved_json["success"] is True
+                json_file = output_path.with_suffix(".ocr.json")
+                assert json_file.exists()
+                saved_json = json.loads(json_file.read_bytes())
+                assert saved_json["success"] is True
 
-    def test_ocr_sync_with_max_pages(self, temp_dir):
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_ocr_sync_with_max_pages(self, sample_pdf_file):
         """Test synchronous OCR with max_pages parameter"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
-        mock_initial_response = {
-            "success": True,
-            "request_id": "test-ocr-request-id",
-            "request_check_url": "https://api.datalab.to/api/v1/ocr/test-ocr-request-id",
-        }
+        mock_initial_response = OCR_INITIAL_RESPONSE
 
         mock_result_response = {
             "success": True,
@@ -639,49 +625,59 @@ class TestOCRMethod:
 
         client = DatalabClient(api_key="test-key")
 
-        with patch.object(
-            client._async_client, "_make_request", new_callable=AsyncMock
-        ) as mock_request:
-            with patch.object(
+        with (
+            patch.object(
+                client._async_client, "_make_request", new_callable=AsyncMock
+            ) as mock_request,
+            patch.object(
                 client._async_client, "_poll_result", new_callable=AsyncMock
-            ) as mock_poll:
-                mock_request.return_value = mock_initial_response
-                mock_poll.return_value = mock_result_response
-
-                options = OCROptions(max_pages=2)
-
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore", DeprecationWarning)
-                    result = client.ocr(pdf_file, options=options)
-
-                assert isinstance(result, OCRResult)
-                assert result.success is True
-                assert len(result.pages) == 2
-
-    def test_sync_wrappers_forward_polling_params(self, temp_dir):
+            ) as mock_poll,
+        ):
+            mock_request.return_value = mock_initial_response
+            mock_poll.return_value = mock_result_response
+
+            options = OCROptions(max_pages=2)
+
+            result = client.ocr(sample_pdf_file, options=options)
+
+            assert isinstance(result, OCRResult)
+            assert result.success is True
+            assert len(result.pages) == 2
+
+    @pytest.mark.parametrize(
+        "method",
+        [
+            "convert",
+            "extract",
+            "segment",
+            "track_changes",
+            "ocr",
+            "run_custom_processor",
+        ],
+    )
+    def test_sync_wrappers_forward_polling_params(self, method, sample_pdf_file):
         """Ensure sync client forwards polling params to async client"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         client = DatalabClient(api_key="test-key")
 
         with patch.object(
-            client._async_client, "convert", new_callable=AsyncMock
-        ) as mock_conv:
-            mock_conv.return_value = ConversionResult(
-                success=True, output_format="markdown", markdown="ok"
-            )
-
-            client.convert(pdf_file, max_polls=5, poll_interval=9)
+            client._async_client, method, new_callable=AsyncMock
+        ) as mock_method:
+            getattr(client, method)(sample_pdf_file, max_polls=5, poll_interval=9)
 
-            _, conv_kwargs = mock_conv.await_args
-            assert conv_kwargs["max_polls"] == 5
-            assert conv_kwargs["poll_interval"] == 9
+            _, kwargs = mock_method.await_args
+            assert kwargs["max_polls"] == 5
+            assert kwargs["poll_interval"] == 9
 
 
 class TestClientErrorHandling:
     """Test error handling in client methods"""
 
+    @pytest.mark.parametrize("base_url", ["", "www.datalab.to", "ftp://datalab.to"])
+    def test_invalid_base_url_fails_fast(self, base_url):
+        """A malformed base_url is rejected when the client is created"""
+        with pytest.raises(DatalabValidationError, match="Invalid base_url"):
+            DatalabClient(api_key="test-key", base_url=base_url)
+
     def test_convert_file_not_found(self, temp_dir):
         """Test convert with nonexistent file"""
         nonexistent_file = temp_dir / "nonexistent.pdf"
@@ -692,11 +688,9 @@ class TestClientErrorHandling:
             client.convert(nonexistent_file)
 
     @pytest.mark.asyncio
-    async def test_ocr_api_error(self, temp_dir):
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    async def test_ocr_api_error(self, sample_pdf_file):
         """Test OCR with API error"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         async with AsyncDatalabClient(api_key="test-key") as client:
             with patch.object(
                 client, "_make_request", new_callable=AsyncMock
@@ -706,15 +700,81 @@ class TestClientErrorHandling:
                 )
 
                 with pytest.raises(DatalabAPIError, match="Bad request"):
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore", DeprecationWarning)
-                        await client.ocr(pdf_file)
+                    await client.ocr(sample_pdf_file)
 
-    def test_convert_unsuccessful_response(self, temp_dir):
-        """Test convert with unsuccessful API response"""
+    @pytest.mark.asyncio
+    async def test_file_upload_streams_and_is_reusable(self, temp_dir):
+        """File payload streams from disk and can be resent on retry"""
         pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
+        content = b"%PDF-1.4\n" + b"x" * 200_000 + b"\n%%EOF\n"
+        pdf_file.write_bytes(content)
+
+        client = AsyncDatalabClient(api_key="test-key")
+        filename, payload, mime_type = client._prepare_file_data(pdf_file)
+
+        assert filename == "test.pdf"
+        assert mime_type == "application/pdf"
+        assert payload.size == len(content)
+
+        class _Writer:
+            def __init__(self):
+                self.chunks = []
 
+            async def write(self, chunk):
+                self.chunks.append(chunk)
+
+        for _ in range(2):
+            writer = _Writer()
+            await payload.write(writer)
+            assert len(writer.chunks) > 1
+            assert b"".join(writer.chunks) == content
+
+    def test_convert_empty_file(self, temp_dir):
+        """Test convert with an empty file"""
+        empty_file = temp_dir / "empty.pdf"
+        empty_file.touch()
+
+        client = DatalabClient(api_key="test-key")
+
+        with pytest.raises(DatalabFileError, match="File is empty"):
+            client.convert(empty_file)
+
+    def test_convert_rejects_directory(self, temp_dir):
+        """A directory path fails up front instead of while streaming"""
+        client = DatalabClient(api_key="test-key")
+
+        with patch.object(
+            client._async_client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            with pytest.raises(DatalabFileError, match="Not a regular file"):
+                client.convert(temp_dir)
+            mock_request.assert_not_called()
+
+    def test_prepare_file_data_rejects_unreadable_file(self, sample_pdf_file):
+        """An unreadable file raises DatalabFileError before building the payload"""
+        client = AsyncDatalabClient(api_key="test-key")
+
+        with patch(
+            "datalab_sdk.client.open",
+            create=True,
+            side_effect=PermissionError(13, "Permission denied"),
+        ):
+            with pytest.raises(DatalabFileError, match="Cannot read file"):
+                client._prepare_file_data(sample_pdf_file)
+
+    @pytest.mark.asyncio
+    async def test_upload_rejects_directory_before_requesting_url(self, temp_dir):
+        """The presigned upload path checks the file before any API call"""
+        async with AsyncDatalabClient(api_key="test-key") as client:
+            with patch.object(
+                client, "_make_request", new_callable=AsyncMock
+            ) as mock_request:
+                with pytest.raises(DatalabFileError, match="Not a regular file"):
+                    await client.upload_files(temp_dir)
+                mock_request.assert_not_called()
+
+    def test_convert_unsuccessful_response(self, sample_pdf_file):
+        """Test convert with unsuccessful API response"""
         mock_initial_response = {
             "success": False,
             "error": "Processing failed",
@@ -732,13 +792,10 @@ class TestClientErrorHandling:
             with pytest.raises(
                 DatalabAPIError, match="Request failed: Processing failed"
             ):
-                client.convert(pdf_file)
+                client.convert(sample_pdf_file)
 
-    def test_convert_timeout_bubbles_up(self, temp_dir):
+    def test_convert_timeout_bubbles_up(self, sample_pdf_file):
         """Polling timeout surfaces as DatalabTimeoutError for sync convert"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         mock_initial_response = {
             "success": True,
             "request_id": "rid-timeout",
@@ -746,17 +803,99 @@ class TestClientErrorHandling:
         }
 
         client = DatalabClient(api_key="test-key")
-        with patch.object(
-            client._async_client, "_make_request", new_callable=AsyncMock
-        ) as mock_request:
-            with patch.object(
+        with (
+            patch.object(
+                client._async_client, "_make_request", new_callable=AsyncMock
+            ) as mock_request,
+            patch.object(
                 client._async_client, "_poll_result", new_callable=AsyncMock
-            ) as mock_poll:
-                mock_request.return_value = mock_initial_response
-                mock_poll.side_effect = DatalabTimeoutError("Polling timed out")
+            ) as mock_poll,
+        ):
+            mock_request.return_value = mock_initial_response
+            mock_poll.side_effect = DatalabTimeoutError("Polling timed out")
+
+            with pytest.raises(DatalabTimeoutError, match="Polling timed out"):
+                client.convert(sample_pdf_file)
+
+
+class TestSyncClientContextManager:
+    """Test session reuse in the sync client"""
+
+    def test_session_shared_across_calls(self):
+        """Calls inside a with block reuse one session, closed on exit"""
+        with DatalabClient(api_key="test-key") as client:
+            session = client._async_client._session
+            assert session is not None
+
+            with patch.object(
+                client._async_client, "_make_request", new_callable=AsyncMock
+            ) as mock_request:
+                mock_request.return_value = {"step_types": []}
+
+                client.get_step_types()
+                client.get_step_types()
+
+                assert mock_request.await_count == 2
+                assert client._async_client._session is session
+                assert not session.closed
+
+        assert session.closed
+        assert client._async_client._session is None
+
+    def test_reentering_reuses_loop(self):
+        """A second __enter__ keeps the existing loop instead of leaking it"""
+        client = DatalabClient(api_key="test-key")
+        client.__enter__()
+        loop = client._loop
+        session = client._async_client._session
+
+        assert client.__enter__() is client
+        assert client._loop is loop
+        assert client._async_client._session is session
+
+        client.close()
+        assert loop.is_closed()
+        assert session.closed
+        assert client._loop is None
+
+    def test_close_without_context_manager_is_noop(self):
+        """close() is safe on a client that never entered a with block"""
+        client = DatalabClient(api_key="test-key")
+        client.close()
+        assert client._loop is None
+        assert client._async_client._session is None
+
+
+class TestRetryAfter:
+    """Test that retries honor the server's Retry-After header"""
+
+    def test_parse_retry_after(self):
+        from datalab_sdk.client import _parse_retry_after
+
+        assert _parse_retry_after("3") == 3.0
+        assert _parse_retry_after("1.5") == 1.5
+        assert _parse_retry_after(None) is None
+        assert _parse_retry_after("soon") is None
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @pytest.mark.asyncio
+    async def test_submit_waits_for_retry_after(self):
+        async with AsyncDatalabClient(api_key="test-key") as client:
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+            ):
+                mock_request.side_effect = [
+                    DatalabAPIError("Rate limited", status_code=429, retry_after=2),
+                    {"success": True},
+                ]
+
+                result = await client._submit_with_retry("/api/v1/convert")
 
-                with pytest.raises(DatalabTimeoutError, match="Polling timed out"):
-                    client.convert(pdf_file)
+                assert result == {"success": True}
+                mock_sleep.assert_awaited_once_with(2)
 
 
 class TestPollingLoop:
@@ -781,6 +920,29 @@ class TestPollingLoop:
                 assert mock_req.await_count == 3
                 assert mock_sleep.await_count >= 1
 
+    @pytest.mark.asyncio
+    async def test_poll_result_backs_off_to_poll_interval(self):
+        async with AsyncDatalabClient(api_key="test-key") as client:
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_req,
+                patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+            ):
+                mock_req.side_effect = [
+                    {"status": "processing", "success": True}
+                ] * 5 + [{"status": "complete", "success": True}]
+
+                result = await client._poll_result(
+                    "https://api.example.com/check", max_polls=10, poll_interval=1
+                )
+
+                assert result["status"] == "complete"
+                intervals = [c.args[0] for c in mock_sleep.await_args_list]
+                assert intervals[0] == 0.25
+                assert intervals == sorted(intervals)
+                assert intervals[-1] == 1
+
     @pytest.mark.asyncio
     async def test_poll_result_raises_on_failed_status(self):
         async with AsyncDatalabClient(api_key="test-key") as client:
@@ -803,11 +965,8 @@ class TestExtractWithSchemaId:
     """Test extract with schema_id support"""
 
     @pytest.mark.asyncio
-    async def test_extract_with_schema_id(self, temp_dir):
+    async def test_extract_with_schema_id(self, sample_pdf_file):
         """Test extraction using a saved schema ID"""
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
         mock_initial = {
             "success": True,
             "request_id": "ext-schema",
@@ -823,12 +982,18 @@ class TestExtractWithSchemaId:
         options = ExtractOptions(schema_id="sch_k8Hx9mP2nQ4v")
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(client, "_make_request", new_callable=AsyncMock) as mock_req:
-                with patch.object(client, "_poll_result", new_callable=AsyncMock) as mock_poll:
-                    mock_req.return_value = mock_initial
-                    mock_poll.return_value = mock_result
-                    result = await client.extract(pdf_file, options=options)
-                    assert result.success is True
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_req,
+                patch.object(
+                    client, "_poll_result", new_callable=AsyncMock
+                ) as mock_poll,
+            ):
+                mock_req.return_value = mock_initial
+                mock_poll.return_value = mock_result
+                result = await client.extract(sample_pdf_file, options=options)
+                assert result.success is True
 
     @pytest.mark.asyncio
     async def test_extract_rejects_both_page_schema_and_schema_id(self):
@@ -897,6 +1062,75 @@ class TestCustomProcessorOptions:
         assert "disable_image_extraction" in form_data
 
 
+class TestConversionResultSaveOutput:
+    """Test saving conversion results to disk"""
+
+    def test_saves_all_images(self, temp_dir):
+        images = {
+            f"img{i}.png": base64.b64encode(f"image-{i}".encode()).decode()
+            for i in range(10)
+        }
+        result = ConversionResult(
+            success=True, output_format="markdown", markdown="# Doc", images=images
+        )
+
+        (temp_dir / "out").mkdir()
+        result.save_output(temp_dir / "out" / "doc")
+
+        assert (temp_dir / "out" / "doc.md").read_text() == "# Doc"
+        for i in range(10):
+            assert (temp_dir / "out" / f"img{i}.png").read_bytes() == f"image-{i}".encode()
+
+    def test_json_outputs_keep_unicode(self, temp_dir):
+        result = ConversionResult(
+            success=True,
+            output_format="json",
+            json={"text": "日本語"},
+            metadata={"title": "Überblick"},
+        )
+
+        result.save_output(temp_dir / "doc")
+
+        saved = (temp_dir / "doc.json").read_text(encoding="utf-8")
+        assert "日本語" in saved
+        assert json.loads(saved) == {"text": "日本語"}
+        metadata = (temp_dir / "doc.metadata.json").read_text(encoding="utf-8")
+        assert json.loads(metadata) == {"title": "Überblick"}
+
+
+class TestOCRResultText:
+    """Test text extraction from OCR results"""
+
+    def _result(self):
+        return OCRResult(
+            success=True,
+            pages=[
+                {"page": 1, "text_lines": [{"text": "a"}, {"text": "b"}]},
+                {"page": 2, "text_lines": []},
+                {"page": 3, "text_lines": [{"text": "c"}]},
+            ],
+        )
+
+    def test_get_text_all_pages(self):
+        assert self._result().get_text() == "a\nb\n\n\n\nc"
+
+    def test_get_text_single_page(self):
+        result = self._result()
+        assert result.get_text(page_num=1) == "a\nb"
+        assert result.get_text(page_num=4) == ""
+
+    def test_save_output_keeps_unicode(self, temp_dir):
+        result = OCRResult(
+            success=True, pages=[{"page": 1, "text_lines": [{"text": "مرحبا"}]}]
+        )
+
+        result.save_output(temp_dir / "doc")
+
+        saved = (temp_dir / "doc.ocr.json").read_text(encoding="utf-8")
+        assert "مرحبا" in saved
+        assert json.loads(saved)["pages"] == result.pages
+
+
 class TestConvertEvalRubricId:
     """Test eval_rubric_id on ConvertOptions"""
 
@@ -912,14 +1146,33 @@ class TestConvertEvalRubricId:
         assert "eval_rubric_id" in form_data
 
 
+class TestConvertAdditionalConfig:
+    """Test additional_config encoding on ConvertOptions"""
+
+    def test_omitted_by_default(self):
+        form_data = ConvertOptions().to_form_data()
+        assert "additional_config" not in form_data
+        assert "keep_spreadsheet_formatting" not in form_data
+
+    def test_merges_keep_spreadsheet_formatting(self):
+        options = ConvertOptions(additional_config={"a": 1})
+        assert json.loads(options.to_form_data()["additional_config"][1]) == {"a": 1}
+
+        options.keep_spreadsheet_formatting = True
+        form_data = options.to_form_data()
+        assert "keep_spreadsheet_formatting" not in form_data
+        assert json.loads(form_data["additional_config"][1]) == {
+            "a": 1,
+            "keep_spreadsheet_formatting": True,
+        }
+        assert options.additional_config == {"a": 1}
+
+
 class TestRunCustomProcessorMethod:
     """Test run_custom_processor and deprecation of run_custom_pipeline"""
 
     @pytest.mark.asyncio
-    async def test_run_custom_processor(self, temp_dir):
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
+    async def test_run_custom_processor(self, sample_pdf_file):
         mock_initial = {
             "success": True,
             "request_id": "cp-id",
@@ -935,18 +1188,23 @@ class TestRunCustomProcessorMethod:
         options = CustomProcessorOptions(pipeline_id="cp_abc12")
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(client, "_make_request", new_callable=AsyncMock) as mock_req:
-                with patch.object(client, "_poll_result", new_callable=AsyncMock) as mock_poll:
-                    mock_req.return_value = mock_initial
-                    mock_poll.return_value = mock_result
-                    result = await client.run_custom_processor(pdf_file, options=options)
-                    assert result.success is True
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_req,
+                patch.object(
+                    client, "_poll_result", new_callable=AsyncMock
+                ) as mock_poll,
+            ):
+                mock_req.return_value = mock_initial
+                mock_poll.return_value = mock_result
+                result = await client.run_custom_processor(
+                    sample_pdf_file, options=options
+                )
+                assert result.success is True
 
     @pytest.mark.asyncio
-    async def test_run_custom_pipeline_emits_deprecation(self, temp_dir):
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
+    async def test_run_custom_pipeline_emits_deprecation(self, sample_pdf_file):
         mock_initial = {
             "success": True,
             "request_id": "cp-id",
@@ -962,18 +1220,26 @@ class TestRunCustomProcessorMethod:
         options = CustomProcessorOptions(pipeline_id="cp_abc12")
 
         async with AsyncDatalabClient(api_key="test-key") as client:
-            with patch.object(client, "_make_request", new_callable=AsyncMock) as mock_req:
-                with patch.object(client, "_poll_result", new_callable=AsyncMock) as mock_poll:
-                    mock_req.return_value = mock_initial
-                    mock_poll.return_value = mock_result
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_req,
+                patch.object(
+                    client, "_poll_result", new_callable=AsyncMock
+                ) as mock_poll,
+            ):
+                mock_req.return_value = mock_initial
+                mock_poll.return_value = mock_result
 
-                    with warnings.catch_warnings(record=True) as w:
-                        warnings.simplefilter("always")
-                        result = await client.run_custom_pipeline(pdf_file, options=options)
-                        assert len(w) == 1
-                        assert issubclass(w[0].category, DeprecationWarning)
-                        assert "run_custom_processor" in str(w[0].message)
-                    assert result.success is True
+                with warnings.catch_warnings(record=True) as w:
+                    warnings.simplefilter("always")
+                    result = await client.run_custom_pipeline(
+                        sample_pdf_file, options=options
+                    )
+                    assert len(w) == 1
+                    assert issubclass(w[0].category, DeprecationWarning)
+                    assert "run_custom_processor" in str(w[0].message)
+                assert result.success is True
 
 
 class TestExtractionSchemaCRUD:
@@ -1098,10 +1364,7 @@ class TestPipelineExecution:
     """Test pipeline execution methods"""
 
     @pytest.mark.asyncio
-    async def test_run_pipeline(self, temp_dir):
-        pdf_file = temp_dir / "test.pdf"
-        pdf_file.write_bytes(b"%PDF-1.4\n%Test PDF content\n%%EOF\n")
-
+    async def test_run_pipeline(self, sample_pdf_file):
         mock_response = {
             "execution_id": "pex_abc123", "pipeline_id": "pl_abc123",
             "pipeline_version": 1, "status": "pending",
@@ -1114,7 +1377,9 @@ class TestPipelineExecution:
         async with AsyncDatalabClient(api_key="test-key") as client:
             with patch.object(client, "_submit_with_retry", new_callable=AsyncMock) as mock_submit:
                 mock_submit.return_value = mock_response
-                result = await client.run_pipeline("pl_abc123", file_path=pdf_file)
+                result = await client.run_pipeline(
+                    "pl_abc123", file_path=sample_pdf_file
+                )
                 assert isinstance(result, PipelineExecution)
                 assert result.execution_id == "pex_abc123"
                 assert len(result.steps) == 1
@@ -1199,3 +1464,33 @@ class TestPipelineProcessorModel:
         d = step.to_dict()
         assert d["custom_processor_id"] == "cp_abc12"
         assert d["eval_rubric_id"] == 5
+
+
+class TestPackageAttributes:
+    """Test lazy attribute access on the datalab_sdk package"""
+
+    def test_submodules_accessible_as_attributes(self):
+        """Submodules resolve on a fresh import without importing them first"""
+        code = (
+            "import datalab_sdk\n"
+            "print(datalab_sdk.client.DatalabClient.__name__)\n"
+            "print(datalab_sdk.models.ConvertOptions.__name__)\n"
+            "print(type(datalab_sdk.settings).__name__)\n"
+            "print(datalab_sdk.exceptions.DatalabError.__name__)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == [
+            "DatalabClient",
+            "ConvertOptions",
+            "Settings",
+            "DatalabError",
+        ]
+
+    def test_unknown_attribute_raises(self):
+        import datalab_sdk
+
+        with pytest.raises(AttributeError):
+            datalab_sdk.not_a_real_attribute
@@ -265,6 +265,45 @@ class TestWorkflowMethods:
                 assert "step1" in execution.steps
                 assert mock_request.call_count == 2  # 2 status checks
 
+    @pytest.mark.asyncio
+    async def test_get_execution_status_backs_off(self):
+        """Checks start quickly, grow to poll_interval, and stop at max_polls"""
+        mock_status_processing = {
+            "execution_id": 1,
+            "workflow_id": 1,
+            "status": "IN_PROGRESS",
+            "steps": {},
+        }
+        # Fake clock that only moves when the client sleeps
+        clock = [0.0]
+
+        async def fake_sleep(seconds):
+            clock[0] += seconds
+
+        async with AsyncDatalabClient(api_key="test-key") as client:
+            with (
+                patch.object(
+                    client, "_make_request", new_callable=AsyncMock
+                ) as mock_request,
+                patch("asyncio.sleep", side_effect=fake_sleep) as mock_sleep,
+                patch("datalab_sdk.client.time") as mock_time,
+            ):
+                mock_time.monotonic.side_effect = lambda: clock[0]
+                mock_request.return_value = mock_status_processing
+
+                execution = await client.get_execution_status(execution_id=1)
+                assert execution.status == "IN_PROGRESS"
+                assert mock_request.call_count == 1
+                mock_sleep.assert_not_called()
+
+                await client.get_execution_status(
+                    execution_id=1, max_polls=4, poll_interval=0.5
+                )
+                waits = [c.args[0] for c in mock_sleep.call_args_list]
+                assert waits[:3] == [0.25, 0.375, 0.5]
+                assert sum(waits) >= 1.5
+                assert mock_request.call_count == 1 + len(waits) + 1
+
     @pytest.mark.asyncio
     async def test_get_execution_status_failed(self):
         """Test checking execution status when workflow fails"""